@@ -1,9 +1,13 @@
+import time
+_import_start = time.perf_counter()
+
 import os
 import json
-from flask import Flask, render_template, request, Response, send_from_directory
+import threading
+from flask import Flask, render_template, request, Response, send_from_directory, jsonify
 import requests
-import chromadb
-from rank_bm25 import BM25Okapi
+
+IMPORT_SECONDS = time.perf_counter() - _import_start
 
 app = Flask(__name__)
 
@@ -16,6 +20,9 @@ LLM_MODEL = "llama3.1"
 MERGE_THRESHOLD_SECONDS = 10
 RRF_K = 60  # Constant for Reciprocal Rank Fusion
 TOP_N_RESULTS = 7 # Number of results to fetch
+DEBUG = True
+HOST = "127.0.0.1"
+PORT = 5000
 
 VIDEO_DIR_ABSOLUTE = os.path.abspath(VIDEO_DIR)
 
@@ -27,9 +34,23 @@ corpus_ids = []
 corpus_docs = {}
 corpus_metadatas = {}
 
+# --- Readiness state ---
+# Indexes are built in a background thread so the server can bind right away.
+index_status = "loading"  # "loading", "ready" or "error"
+index_load_seconds = None
+index_document_count = 0
+seconds_to_listen = None  # From the first import until the socket is bound (non-debug only)
+seconds_to_ready = None   # From the first import until the indexes are loaded
+
 def initialize_hybrid_search():
-    """Initializes ChromaDB client and BM25 index from transcript files."""
+    """
+    Initializes ChromaDB client and BM25 index from transcript files.
+    Returns False only if ChromaDB can't be reached; an empty corpus is still usable.
+    """
     global client, collection, bm25, corpus_ids, corpus_docs, corpus_metadatas
+    # Heavy imports are deferred so importing this module stays fast
+    import chromadb
+    from rank_bm25 import BM25Okapi
     
     # 1. Initialize ChromaDB
     try:
@@ -38,7 +59,7 @@ def initialize_hybrid_search():
         print("Successfully connected to ChromaDB collection.")
     except Exception as e:
         print(f"Error connecting to ChromaDB: {e}")
-        return
+        return False
 
     # 2. Load all documents from JSONs to build corpus for BM25
     print("Initializing BM25 keyword search index...")
@@ -71,6 +92,27 @@ def initialize_hybrid_search():
         print(f"BM25 index initialized with {len(doc_texts)} documents.")
     else:
         print("No documents found to initialize BM25 index.")
+    return True
+
+def load_indexes_in_background():
+    """Builds the search indexes on a daemon thread and records readiness."""
+    def _load():
+        global index_status, index_load_seconds, index_document_count, seconds_to_ready
+        load_start = time.perf_counter()
+        try:
+            ok = initialize_hybrid_search()
+        except Exception as e:
+            print(f"Error initializing hybrid search: {e}")
+            ok = False
+        index_load_seconds = time.perf_counter() - load_start
+        seconds_to_ready = time.perf_counter() - _import_start
+        index_document_count = len(corpus_ids)
+        index_status = "ready" if ok else "error"
+        print(f"Search indexes {index_status} with {index_document_count} documents: "
+              f"loading took {index_load_seconds:.2f} s, {seconds_to_ready:.2f} s since start "
+              f"(imports took {IMPORT_SECONDS * 1000:.0f} ms).")
+
+    threading.Thread(target=_load, name="index-loader", daemon=True).start()
 
 # --- Prompt Template ---
 PROMPT_TEMPLATE = '''
@@ -151,9 +193,24 @@ def index():
 def serve_video(filename):
     return send_from_directory(VIDEO_DIR_ABSOLUTE, filename)
 
+@app.route('/ready')
+def ready():
+    """Readiness probe: 200 once the search indexes are loaded, 503 until then."""
+    body = {
+        "status": index_status,
+        "import_seconds": IMPORT_SECONDS,
+        "seconds_to_listen": seconds_to_listen,
+        "index_load_seconds": index_load_seconds,
+        "document_count": index_document_count,
+        "seconds_to_ready": seconds_to_ready,
+    }
+    return jsonify(body), 200 if index_status == "ready" else 503
+
 @app.route('/ask', methods=['POST'])
 def ask():
-    if not collection or not bm25: return Response("Error: Search index not available.", status=500)
+    if index_status == "loading": return Response("Search index is still loading, please try again shortly.", status=503)
+    if not collection: return Response("Error: Search index not available.", status=500)
+    if not bm25: return Response("No transcripts have been indexed yet. Run ingest.py first.", status=503)
 
     data = request.get_json()
     query = data.get('question')
@@ -206,5 +263,19 @@ def ask():
     return Response(generate_response_stream(prompt, merged_sources), mimetype='application/x-ndjson')
 
 if __name__ == '__main__':
-    initialize_hybrid_search()
-    app.run(debug=True, threaded=True)
\ No newline at end of file
+    if DEBUG:
+        # The debug reloader binds inside app.run, so only time to ready is reported.
+        # Only the child process that serves requests loads indexes.
+        if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+            load_indexes_in_background()
+        app.run(host=HOST, port=PORT, debug=True, threaded=True)
+    else:
+        from werkzeug.serving import make_server
+
+        # make_server binds the socket before returning, so the bind time is exact
+        server = make_server(HOST, PORT, app, threaded=True)
+        seconds_to_listen = time.perf_counter() - _import_start
+        print(f"Listening on http://{HOST}:{PORT} after {seconds_to_listen * 1000:.0f} ms "
+              f"(imports took {IMPORT_SECONDS * 1000:.0f} ms).")
+        load_indexes_in_background()
+        server.serve_forever()
\ No newline at end of file
@@ -1,63 +1,84 @@
-import whisper
 import json
 import os
+from transcribe_cpu import transcribe_parallel, clear_checkpoints, cuda_available
 
-print("Loading Whisper model on GPU...")
-model = whisper.load_model("large", device="cuda")
+WHISPER_MODEL = "large"
+TRANSCRIBE_WORKERS = None  # CPU mode only; None = derive from the CPU count, available RAM and model size
 
-# Check if audios directory exists
-if not os.path.exists("audios"):
-    print("Error: 'audios' directory not found!")
-    exit()
+# The guard keeps process pool workers from re-running the script when they import it
+if __name__ == "__main__":
+    use_gpu = cuda_available()
+    if use_gpu:
+        # Imported here so pool workers re-importing this script under spawn skip it
+        import whisper
 
-audios = os.listdir("audios")
+        print("Loading Whisper model on GPU...")
+        model = whisper.load_model(WHISPER_MODEL, device="cuda")
+    else:
+        print("No GPU found, using parallel CPU transcription...")
+
+    # Check if audios directory exists
+    if not os.path.exists("audios"):
+        print("Error: 'audios' directory not found!")
+        exit()
 
-# Create jsons directory if it doesn't exist
-if not os.path.exists("jsons"):
-    os.makedirs("jsons")
+    audios = os.listdir("audios")
 
-for audio in audios: 
-    if audio.endswith('.mp3') and "_" in audio:
-        try:
-            # Since all files now follow the format: "number_title.mp3"
-            parts = audio.split("_", 1)  # Split only on first underscore
-            number = parts[0]  # First part is the number (0, 1, 2, etc.)
-            title = parts[1].replace(".mp3", "")  # Everything after first underscore, remove extension
+    # Create jsons directory if it doesn't exist
+    if not os.path.exists("jsons"):
+        os.makedirs("jsons")
+
+    for audio in audios: 
+        if audio.endswith('.mp3') and "_" in audio:
+            try:
+                # Since all files now follow the format: "number_title.mp3"
+                parts = audio.split("_", 1)  # Split only on first underscore
+                number = parts[0]  # First part is the number (0, 1, 2, etc.)
+                title = parts[1].replace(".mp3", "")  # Everything after first underscore, remove extension
             
-            # Create filename in format: number_title.json
-            output_filename = f"jsons/{number}_{title}.json"
+                # Create filename in format: number_title.json
+                output_filename = f"jsons/{number}_{title}.json"
             
-            # Check if JSON file already exists
-            if os.path.exists(output_filename):
-                print(f"Skipping {audio} - JSON file already exists: {output_filename}")
-                continue
+                # Check if JSON file already exists
+                if os.path.exists(output_filename):
+                    print(f"Skipping {audio} - JSON file already exists: {output_filename}")
+                    continue
             
-            print(f"Processing: {audio}")
-            print(f"Number: {number}, Title: {title}")
+                print(f"Processing: {audio}")
+                print(f"Number: {number}, Title: {title}")
             
-            result = model.transcribe(audio = f"audios/{audio}", 
-                                  language="hi",
-                                  task="translate",
-                                  word_timestamps=False)
+                if use_gpu:
+                    result = model.transcribe(audio = f"audios/{audio}",
+                                          language="hi",
+                                          task="translate",
+                                          word_timestamps=False)
+                else:
+                    result = transcribe_parallel(f"audios/{audio}",
+                                                 model_name=WHISPER_MODEL,
+                                                 workers=TRANSCRIBE_WORKERS,
+                                                 language="hi",
+                                                 task="translate",
+                                                 word_timestamps=False)
             
-            chunks = []
-            for segment in result["segments"]:
-                chunks.append({
-                    "number": number, 
-                    "title": title, 
-                    "start": segment["start"], 
-                    "end": segment["end"], 
-                    "text": segment["text"]
-                })
+                chunks = []
+                for segment in result["segments"]:
+                    chunks.append({
+                        "number": number, 
+                        "title": title, 
+                        "start": segment["start"], 
+                        "end": segment["end"], 
+                        "text": segment["text"]
+                    })
             
-            chunks_with_metadata = {"chunks": chunks, "text": result["text"]}
+                chunks_with_metadata = {"chunks": chunks, "text": result["text"]}
 
-            with open(output_filename, "w", encoding="utf-8") as f:
-                json.dump(chunks_with_metadata, f, ensure_ascii=False, indent=2)
+                with open(output_filename, "w", encoding="utf-8") as f:
+                    json.dump(chunks_with_metadata, f, ensure_ascii=False, indent=2)
                 
-            print(f"Saved: {output_filename}")
+                print(f"Saved: {output_filename}")
+                clear_checkpoints(f"audios/{audio}")
             
-        except Exception as e:
-            print(f"Error processing {audio}: {str(e)}")
-    else:
-        print(f"Skipping {audio} - not a valid audio file or missing underscore")
+            except Exception as e:
+                print(f"Error processing {audio}: {str(e)}")
+        else:
+            print(f"Skipping {audio} - not a valid audio file or missing underscore")
@@ -1,10 +1,13 @@
+import time
+_import_start = time.perf_counter()
+
 import os
 import json
 import ffmpeg
-import whisper
-import chromadb
-from chromadb.utils import embedding_functions
 import datetime
+from transcribe_cpu import transcribe_parallel, clear_checkpoints, has_checkpoints, cuda_available
+
+IMPORT_SECONDS = time.perf_counter() - _import_start
 
 # --- Configuration ---
 VIDEO_DIR = "videos"
@@ -12,26 +15,42 @@ AUDIO_DIR = "audios"
 JSON_DIR = "jsons"
 CHROMA_DB_PATH = "chroma_db"
 COLLECTION_NAME = "video_transcripts"
+WHISPER_MODEL = "base"
+CPU_PARALLEL_TRANSCRIPTION = True  # Split on silence and use a process pool when no GPU is available
+TRANSCRIBE_WORKERS = None  # None = derive from the CPU count, available RAM and model size
+
+# --- Lazily created clients and models ---
+# Importing this module stays cheap; ChromaDB and Whisper are only loaded
+# the first time a video actually needs processing.
+_collection = None
+_whisper_model = None
+
+def get_collection():
+    """Returns the ChromaDB collection, connecting on first use."""
+    global _collection
+    if _collection is None:
+        import chromadb
+        from chromadb.utils import embedding_functions
+
+        os.makedirs(CHROMA_DB_PATH, exist_ok=True)
+        client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
+        _collection = client.get_or_create_collection(
+            name=COLLECTION_NAME,
+            embedding_function=embedding_functions.DefaultEmbeddingFunction(),
+            metadata={"hnsw:space": "cosine"}
+        )
+    return _collection
 
-# --- Ensure Directories Exist ---
-os.makedirs(AUDIO_DIR, exist_ok=True)
-os.makedirs(JSON_DIR, exist_ok=True)
-os.makedirs(CHROMA_DB_PATH, exist_ok=True)
-
-# --- Initialize ChromaDB ---
-client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
-embedding_function = embedding_functions.DefaultEmbeddingFunction()
-
-collection = client.get_or_create_collection(
-    name=COLLECTION_NAME,
-    embedding_function=embedding_function,
-    metadata={"hnsw:space": "cosine"}
-)
+def get_whisper_model():
+    """Returns the Whisper model, loading it on first use."""
+    global _whisper_model
+    if _whisper_model is None:
+        import whisper
 
-# --- Load Whisper Model ---
-print("Loading Whisper model...")
-whisper_model = whisper.load_model("base")
-print("Whisper model loaded.")
+        print("Loading Whisper model...")
+        _whisper_model = whisper.load_model(WHISPER_MODEL)
+        print("Whisper model loaded.")
+    return _whisper_model
 
 # --- Core Processing Functions ---
 
@@ -95,15 +114,29 @@ def process_video(video_path):
         return None, None, None
 
     print(f"Processing video: {video_filename}")
-
-    # 1. Extract Audio
-    if not extract_audio(video_path, audio_path):
+    os.makedirs(AUDIO_DIR, exist_ok=True)
+    os.makedirs(JSON_DIR, exist_ok=True)
+
+    # 1. Extract Audio, unless an interrupted transcription of the same audio can be resumed
+    use_parallel = CPU_PARALLEL_TRANSCRIPTION and not cuda_available()
+    can_resume = (
+        use_parallel
+        and os.path.exists(audio_path)
+        and os.path.getmtime(audio_path) >= os.path.getmtime(video_path)
+        and has_checkpoints(audio_path)
+    )
+    if can_resume:
+        print(f"  Resuming interrupted transcription from checkpoints...")
+    elif not extract_audio(video_path, audio_path):
         return None, None, None
 
     # 2. Transcribe Audio with Whisper
     print(f"  Transcribing audio with Whisper...")
     try:
-        result = whisper_model.transcribe(audio_path, fp16=False)
+        if use_parallel:
+            result = transcribe_parallel(audio_path, model_name=WHISPER_MODEL, workers=TRANSCRIBE_WORKERS)
+        else:
+            result = get_whisper_model().transcribe(audio_path, fp16=False)
     except Exception as e:
         print(f"  Error during transcription: {e}")
         return None, None, None
@@ -112,6 +145,8 @@ def process_video(video_path):
     with open(json_path, 'w') as f:
         json.dump(result, f, indent=4)
     print(f"  Transcript saved to {json_path}")
+    # Chunk checkpoints are only dropped once the transcript is safely on disk
+    clear_checkpoints(audio_path)
 
     # 3. Create Chunks from Transcript
     chunks, metadatas = create_chunks_from_transcript(result, video_filename)
@@ -127,7 +162,8 @@ def process_video(video_path):
 
 # --- Main Execution ---
 if __name__ == "__main__":
-    print("Starting the ingestion process...")
+    run_start = time.perf_counter()
+    print(f"Starting the ingestion process... (imports took {IMPORT_SECONDS * 1000:.0f} ms)")
 
     video_files = [f for f in os.listdir(VIDEO_DIR) if f.endswith(('.mp4', '.mov', '.avi', '.mkv'))]
 
@@ -145,7 +181,7 @@ if __name__ == "__main__":
 
     if all_chunks:
         # Check for existing IDs to avoid duplicates before adding
-        existing_ids = collection.get(ids=all_ids).get('ids', [])
+        existing_ids = get_collection().get(ids=all_ids).get('ids', [])
         if existing_ids:
             print(f"\nFound {len(existing_ids)} existing documents in ChromaDB. Filtering them out.")
             # Filter out chunks that are already in the database
@@ -164,7 +200,7 @@ if __name__ == "__main__":
 
     if all_chunks:
         print(f"\nAdding {len(all_chunks)} new chunks to ChromaDB in a single batch...")
-        collection.add(
+        get_collection().add(
             documents=all_chunks,
             metadatas=all_metadatas,
             ids=all_ids
@@ -174,4 +210,7 @@ if __name__ == "__main__":
         print("\nNo new chunks to add to ChromaDB.")
 
     print("\nIngestion process finished.")
-    print(f"Total documents in collection '{COLLECTION_NAME}': {collection.count()}")
+    # Only report the collection size if we already had to open it
+    if _collection is not None:
+        print(f"Total documents in collection '{COLLECTION_NAME}': {_collection.count()}")
+    print(f"Total time: {time.perf_counter() - run_start:.2f} s")
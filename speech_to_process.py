@@ -1,49 +1,59 @@
-import whisper
 import os
 import json
 import time
+from transcribe_cpu import transcribe_parallel, clear_checkpoints, cuda_available
 
 # Audio file path
 audio_file = "audios/0_Introduction_to_Structured_Query_Language_All_Points_regarding_its_Features_and_Syllabus.mp3"
+TRANSCRIBE_WORKERS = None  # CPU mode only; None = derive from the CPU count, available RAM and model size
 
-if os.path.exists(audio_file):
-    print(f"Processing: {audio_file}")
+# The guard keeps process pool workers from re-running the script when they import it
+if __name__ == "__main__":
+    if os.path.exists(audio_file):
+        print(f"Processing: {audio_file}")
     
-    start_time = time.time()
+        start_time = time.time()
     
-    # Use original Whisper with GPU
-    print("Loading Whisper model on GPU...")
-    model = whisper.load_model("large", device="cuda")
-    
-    print("Starting transcription...")
-    result = model.transcribe(audio_file, language="hi", task="translate", word_timestamps=False)
-    
-    print("Full transcription:")
-    print(result["text"])
-    
-    # Process segments
-    chunks = []
-    for segment in result["segments"]:
-        chunks.append({
-            "start": segment["start"],
-            "end": segment["end"], 
-            "text": segment["text"]
-        })
-        print(f"[{segment['start']:.1f}s -> {segment['end']:.1f}s] {segment['text']}")
-    
-    end_time = time.time()
-    processing_time = end_time - start_time
-    
-    print(f"\n✅ Processing completed in {processing_time/60:.1f} minutes")
-    
-    # Save outputs
-    with open("output.json", "w", encoding='utf-8') as f:
-        json.dump(chunks, f, ensure_ascii=False, indent=2)
-    
-    with open("full_transcript.txt", "w", encoding='utf-8') as f:
-        f.write(result["text"])
-    
-    print("Files saved: output.json and full_transcript.txt")
-    
-else:
-    print(f"File not found: {audio_file}")
+        if cuda_available():
+            # Use original Whisper with GPU
+            import whisper
+
+            print("Loading Whisper model on GPU...")
+            model = whisper.load_model("large", device="cuda")
+
+            print("Starting transcription...")
+            result = model.transcribe(audio_file, language="hi", task="translate", word_timestamps=False)
+        else:
+            print("No GPU found, starting parallel CPU transcription...")
+            result = transcribe_parallel(audio_file, model_name="large", workers=TRANSCRIBE_WORKERS, language="hi", task="translate", word_timestamps=False)
+    
+        print("Full transcription:")
+        print(result["text"])
+    
+        # Process segments
+        chunks = []
+        for segment in result["segments"]:
+            chunks.append({
+                "start": segment["start"],
+                "end": segment["end"], 
+                "text": segment["text"]
+            })
+            print(f"[{segment['start']:.1f}s -> {segment['end']:.1f}s] {segment['text']}")
+    
+        end_time = time.time()
+        processing_time = end_time - start_time
+    
+        print(f"\n✅ Processing completed in {processing_time/60:.1f} minutes")
+    
+        # Save outputs
+        with open("output.json", "w", encoding='utf-8') as f:
+            json.dump(chunks, f, ensure_ascii=False, indent=2)
+    
+        with open("full_transcript.txt", "w", encoding='utf-8') as f:
+            f.write(result["text"])
+    
+        print("Files saved: output.json and full_transcript.txt")
+        clear_checkpoints(audio_file)
+    
+    else:
+        print(f"File not found: {audio_file}")
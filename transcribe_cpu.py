@@ -0,0 +1,307 @@
+import os
+import re
+import json
+import shutil
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import ffmpeg
+
+# --- Configuration ---
+SAMPLE_RATE = 16000
+SILENCE_NOISE_DB = -35      # Anything quieter than this counts as silence
+SILENCE_MIN_DURATION = 0.5  # Seconds of quiet needed before we may split there
+TARGET_CHUNK_SECONDS = 300  # Preferred chunk length
+MIN_CHUNK_SECONDS = 60      # Never split closer than this to the previous cut
+MAX_CHUNK_SECONDS = 600     # Hard cut if no silence is found before this
+CHECKPOINT_DIR = "checkpoints"
+
+# Rough resident memory (GB) of one fp32 Whisper model on CPU, per worker process
+MODEL_MEMORY_GB = {
+    "tiny": 1, "base": 1, "small": 2, "medium": 5,
+    "large": 10, "large-v1": 10, "large-v2": 10, "large-v3": 10, "turbo": 6,
+}
+DEFAULT_MODEL_MEMORY_GB = 10
+
+_SILENCE_START_RE = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END_RE = re.compile(r"silence_end:\s*(-?[\d.]+)")
+
+# Whisper model of the current worker process, loaded once by _init_worker
+_worker_model = None
+
+
+def available_memory_gb():
+    """
+    Returns the memory available for new processes in GB (MemAvailable, which
+    counts reclaimable page cache), or None if it can't be determined.
+    """
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) / 1024 ** 2  # Reported in kB
+    except (OSError, ValueError, IndexError):
+        pass
+    # Not Linux: fall back to free pages, which underestimates what is usable
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_AVPHYS_PAGES') / 1024 ** 3
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def default_workers(model_name):
+    """
+    Picks a worker count that fits both the CPU and the RAM: every worker
+    holds its own copy of the model, so large models get few workers.
+    """
+    cpu_workers = max(1, (os.cpu_count() or 1) // 2)
+    model_gb = MODEL_MEMORY_GB.get(model_name, DEFAULT_MODEL_MEMORY_GB)
+    memory_gb = available_memory_gb()
+    if memory_gb is None:
+        # Without a memory reading, only small models get more than one worker
+        return cpu_workers if model_gb <= 2 else 1
+    return max(1, min(cpu_workers, int(memory_gb // model_gb)))
+
+
+def checkpoint_dir_for(audio_path):
+    """Returns the default checkpoint directory of an audio file."""
+    base_name = os.path.splitext(os.path.basename(audio_path))[0]
+    return os.path.join(CHECKPOINT_DIR, base_name)
+
+
+def clear_checkpoints(audio_path, checkpoint_dir=None):
+    """Removes the checkpoints of an audio file. Call this once its transcript is saved."""
+    shutil.rmtree(checkpoint_dir or checkpoint_dir_for(audio_path), ignore_errors=True)
+
+
+def _audio_fingerprint(audio_path):
+    """
+    Identifies the audio a plan was made for, so a replaced file invalidates old
+    checkpoints. Based on content rather than mtime, so rewriting identical
+    audio keeps them valid.
+    """
+    digest = hashlib.sha256()
+    with open(audio_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return {"size": os.path.getsize(audio_path), "sha256": digest.hexdigest()}
+
+
+def _plan_path(checkpoint_dir):
+    return os.path.join(checkpoint_dir, "plan.json")
+
+
+def has_checkpoints(audio_path, checkpoint_dir=None):
+    """Returns True if an interrupted transcription of this audio can be resumed."""
+    return _load_json(_plan_path(checkpoint_dir or checkpoint_dir_for(audio_path))) is not None
+
+
+def get_duration(audio_path):
+    """Returns the duration of an audio file in seconds."""
+    probe = ffmpeg.probe(audio_path)
+    return float(probe['format']['duration'])
+
+
+def detect_silences(audio_path, noise_db=SILENCE_NOISE_DB, min_duration=SILENCE_MIN_DURATION):
+    """Runs ffmpeg's silencedetect filter and returns a list of (start, end) silences."""
+    _, stderr = (
+        ffmpeg
+        .input(audio_path)
+        .filter('silencedetect', noise=f"{noise_db}dB", d=min_duration)
+        .output('-', format='null')
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+    silences = []
+    start = None
+    for line in stderr.decode(errors='ignore').splitlines():
+        match = _SILENCE_START_RE.search(line)
+        if match:
+            start = max(0.0, float(match.group(1)))
+            continue
+        match = _SILENCE_END_RE.search(line)
+        if match and start is not None:
+            silences.append((start, float(match.group(1))))
+            start = None
+    return silences
+
+
+def plan_chunks(duration, silences, target=TARGET_CHUNK_SECONDS,
+                min_len=MIN_CHUNK_SECONDS, max_len=MAX_CHUNK_SECONDS):
+    """
+    Splits [0, duration] into (start, end) chunks, cutting in the middle of a
+    silence closest to `target` seconds after the previous cut. Falls back to a
+    hard cut at `max_len` when a stretch has no usable silence. Cuts never leave
+    a tail shorter than `min_len`, since Whisper tends to hallucinate on short clips.
+    """
+    split_points = [(s + e) / 2 for s, e in silences]
+    chunks = []
+    chunk_start = 0.0
+    while duration - chunk_start > max_len:
+        latest_cut = min(chunk_start + max_len, duration - min_len)
+        candidates = [p for p in split_points if chunk_start + min_len <= p <= latest_cut]
+        if candidates:
+            cut = min(candidates, key=lambda p: abs(p - (chunk_start + target)))
+        else:
+            cut = latest_cut
+        chunks.append((round(chunk_start, 3), round(cut, 3)))
+        chunk_start = cut
+    chunks.append((round(chunk_start, 3), round(duration, 3)))
+    return chunks
+
+
+def load_audio_range(audio_path, start, end):
+    """Decodes [start, end) of an audio file to a 16 kHz mono float32 array, as Whisper expects."""
+    import numpy as np
+
+    out, _ = (
+        ffmpeg
+        .input(audio_path, ss=start, t=end - start)
+        .output('-', format='s16le', acodec='pcm_s16le', ac=1, ar=SAMPLE_RATE)
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+
+def _init_worker(model_name, threads):
+    """Process pool initializer: loads one Whisper model per worker process."""
+    global _worker_model
+    import torch
+    import whisper
+
+    torch.set_num_threads(threads)
+    _worker_model = whisper.load_model(model_name, device="cpu")
+
+
+def _transcribe_chunk(audio_path, index, start, end, checkpoint_path, transcribe_kwargs):
+    """Transcribes one chunk in a worker process and writes its checkpoint."""
+    audio = load_audio_range(audio_path, start, end)
+    result = _worker_model.transcribe(audio, fp16=False, **transcribe_kwargs)
+    checkpoint = {"index": index, "start": start, "end": end, "result": result}
+    _write_json_atomic(checkpoint_path, checkpoint)
+    return index
+
+
+def _write_json_atomic(path, data):
+    """Writes to a temp file first so an interrupted run never leaves a half-written file."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _load_json(path):
+    """Returns the parsed file, or None if it is missing or unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def stitch_results(checkpoints):
+    """
+    Merges per-chunk Whisper results into a single result with the same shape
+    as `model.transcribe()`: segment times are shifted to absolute offsets and
+    segment ids are renumbered.
+    """
+    segments = []
+    texts = []
+    language = None
+    for checkpoint in sorted(checkpoints, key=lambda c: c['index']):
+        offset = checkpoint['start']
+        result = checkpoint['result']
+        language = language or result.get('language')
+        texts.append(result.get('text', '').strip())
+        for segment in result.get('segments', []):
+            segment = dict(segment)
+            segment['id'] = len(segments)
+            segment['start'] = round(segment['start'] + offset, 3)
+            segment['end'] = round(segment['end'] + offset, 3)
+            if 'seek' in segment:
+                # seek is measured in 10 ms mel frames
+                segment['seek'] = segment['seek'] + int(round(offset * 100))
+            if 'words' in segment:
+                segment['words'] = [
+                    dict(word, start=round(word['start'] + offset, 3), end=round(word['end'] + offset, 3))
+                    for word in segment['words']
+                ]
+            segments.append(segment)
+    return {"text": " ".join(t for t in texts if t), "segments": segments, "language": language}
+
+
+def transcribe_parallel(audio_path, model_name="base", workers=None, checkpoint_dir=None,
+                        **transcribe_kwargs):
+    """
+    Transcribes a long audio file on CPU by splitting it on silence and
+    running the chunks across a process pool.
+
+    Each finished chunk is checkpointed under `checkpoint_dir`, so rerunning
+    after an interruption only transcribes the chunks that are missing.
+    Checkpoints are kept after returning; call `clear_checkpoints()` once the
+    transcript has been saved. Extra keyword arguments (e.g. language, task)
+    are passed to Whisper.
+    """
+    cpu_count = os.cpu_count() or 1
+    if not workers:
+        workers = default_workers(model_name)
+    threads = max(1, cpu_count // workers)
+
+    checkpoint_dir = checkpoint_dir or checkpoint_dir_for(audio_path)
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    fingerprint = _audio_fingerprint(audio_path)
+
+    # Reuse the saved plan on resume so chunk boundaries match existing checkpoints
+    plan_path = _plan_path(checkpoint_dir)
+    plan = _load_json(plan_path)
+    if plan is None:
+        if os.path.exists(plan_path):
+            print("  Checkpoint plan is unreadable, starting transcription from scratch.")
+    else:
+        if plan.get('audio') != fingerprint:
+            print("  Audio file changed since the last run, starting transcription from scratch.")
+            plan = None
+        elif plan.get('model') != model_name or plan.get('options') != transcribe_kwargs:
+            print("  Checkpoint settings changed, starting transcription from scratch.")
+            plan = None
+    if plan is None:
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        duration = get_duration(audio_path)
+        chunks = plan_chunks(duration, detect_silences(audio_path))
+        plan = {"audio": fingerprint, "model": model_name, "options": transcribe_kwargs, "chunks": chunks}
+        _write_json_atomic(plan_path, plan)
+
+    checkpoints = {}
+    pending = []
+    for index, (start, end) in enumerate(plan['chunks']):
+        checkpoint_path = os.path.join(checkpoint_dir, f"chunk_{index:04d}.json")
+        checkpoint = _load_json(checkpoint_path)
+        if checkpoint is not None:
+            checkpoints[index] = checkpoint
+        else:
+            pending.append((index, start, end, checkpoint_path))
+
+    print(f"  {len(plan['chunks'])} chunks, {len(checkpoints)} already done, "
+          f"transcribing {len(pending)} with {workers} workers...")
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)),
+                                 initializer=_init_worker, initargs=(model_name, threads)) as executor:
+            futures = [
+                executor.submit(_transcribe_chunk, audio_path, index, start, end, path, transcribe_kwargs)
+                for index, start, end, path in pending
+            ]
+            for future in as_completed(futures):
+                index = future.result()
+                print(f"  Chunk {index + 1}/{len(plan['chunks'])} done.")
+
+        for index, _, _, checkpoint_path in pending:
+            checkpoints[index] = _load_json(checkpoint_path)
+
+    return stitch_results(checkpoints.values())
+
+
+def cuda_available():
+    """Returns True if Whisper can run on a CUDA device."""
+    import torch
+    return torch.cuda.is_available()